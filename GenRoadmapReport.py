@@ -1,174 +1,453 @@
+import argparse
+import io
 import os
 import re
-import pandas as pd
+import sys
+import tempfile
+import time
 from docx import Document
 from docx.shared import Pt, Cm, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.shared import OxmlElement
-from docx.oxml.ns import qn
+from docx.oxml.ns import nsdecls
 import docx.opc.constants
 from docx.enum.section import WD_ORIENTATION
-from docx.oxml import OxmlElement
-import win32com.client
+from docx.oxml import parse_xml
+from docx.oxml.table import CT_Tbl
+from docx.styles.style import ParagraphStyle
 import logging
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
 import getpass  
-import pandas as pd
+from copy import deepcopy
+from dataclasses import dataclass, field
 import logging
 from docx.enum.style import WD_STYLE_TYPE
+from xml.sax.saxutils import escape
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # Optional: fall back to pandas/openpyxl when python-calamine is not installed
+    CalamineWorkbook = None
+
+try:
+    import xlsxwriter
+except ImportError:  # Optional: only needed for --output-format xlsx/both
+    xlsxwriter = None
+
+@dataclass(slots=True)
+class Lead:
+    """
+    A Jira Lead linked to an initiative.
+    """
+    summary: str
+    hebrew_summary: str
+    description: str
+    url: str
+
+@dataclass(slots=True)
+class Initiative:
+    """
+    A Jira Initiative and its leads, keyed by issue key.
+    Dates are stored already formatted for display ('' when unset).
+    """
+    summary: str
+    hebrew_summary: str
+    description: str
+    start_date: str
+    due_date: str
+    url: str
+    leads: dict[str, Lead] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class Goal:
+    """
+    A Jira Goal and its initiatives, grouped by status and keyed by issue key.
+    """
+    summary: str
+    hebrew_summary: str
+    description: str
+    url: str
+    statuses: dict[str, dict[str, Initiative]] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class Theme:
+    """
+    A Jira Theme and its goals, keyed by issue key.
+    """
+    summary: str
+    hebrew_summary: str
+    url: str
+    goals: dict[str, Goal] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class ParseState:
+    """
+    Tracks where the next row belongs while process_data walks the sheet.
+    The current nodes are held directly, so a row is attached without walking down from the theme.
+    """
+    structured_data: dict[str, Theme] = field(default_factory=dict)
+    current_theme: Theme | None = None
+    current_goal: Goal | None = None
+    current_status: str | None = None
+    current_initiative: Initiative | None = None
+
+@dataclass(slots=True)
+class RenderState:
+    """
+    Per-document state shared by the content builders while create_word_document renders a report.
+    Styles are looked up and the status table template parsed once; each hyperlink URL gets one relationship.
+    """
+    heading_styles: dict[int, ParagraphStyle]
+    status_table_template: CT_Tbl
+    hyperlink_r_ids: dict[str, str] = field(default_factory=dict)
+
+# Jira exports dates as "YYYY-MM-DD HH:MM:SS"; calamine reads midnight timestamps as plain "YYYY-MM-DD" dates
+# The time is range-checked like a datetime would (00:00:00-23:59:59) and then dropped from the output
+DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?: (?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d)?')
+MONTH_ABBREVIATIONS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+@lru_cache(maxsize=512)
 def format_date(date_str):
+    """
+    Formats a Jira date as e.g. '05 Jan 2024'. Anything that is not a date is returned unchanged.
+    """
+    # Roadmap dates repeat a lot, hence the cache; the fixed layout is cut up directly instead of using strptime
+    match = DATE_RE.fullmatch(date_str)
+    if match is None:
+        return date_str
+    year, month, day = match.groups()
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-        formatted_date = date_obj.strftime("%d %b %Y")
+        date(int(year), int(month), int(day))  # Reject impossible dates such as 2024-02-30
     except ValueError:
-        formatted_date = date_str  # Return the original if parsing fails
-    return formatted_date
+        return date_str  # Return the original if parsing fails
+    return f"{day} {MONTH_ABBREVIATIONS[int(month) - 1]} {year}"
+
+HEBREW_CHAR_RE = re.compile('[\u0590-\u05FF]')
 
 def format_hebrew_text(text):
     """
     Formats Hebrew text with RTL control characters.
+    Text without any Hebrew characters (including empty text) is returned unchanged.
     """
-    return '\u202B' + text + '\u202C'
+    if not HEBREW_CHAR_RE.search(text):
+        return text
+    return f'\u202B{text}\u202C'
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
-def add_hyperlink(run, url, text):
+JIRA_BROWSE_URL = "https://omnisys.atlassian.net/browse/"
+
+HYPERLINK_XML = (
+    f'<w:hyperlink {nsdecls("w", "r")} r:id="{{r_id}}">'
+    '<w:r><w:rPr/><w:t xml:space="preserve">{text}</w:t></w:r>'
+    '</w:hyperlink>'
+)
+# Links use the template's Hyperlink character style instead of direct underline formatting
+HYPERLINK_STYLE_ID = 'Hyperlink'
+HYPERLINK_RPR = parse_xml(f'<w:rPr {nsdecls("w")}><w:rStyle w:val="{HYPERLINK_STYLE_ID}"/></w:rPr>')
+
+# Field code runs, parsed in one go instead of assembling each w:fldChar/w:instrText element
+PAGE_FIELD_RUN_XML = (
+    f'<w:r {nsdecls("w")}><w:fldChar w:fldCharType="begin"/><w:instrText>PAGE</w:instrText>'
+    '<w:fldChar w:fldCharType="end"/></w:r>'
+)
+TOC_FIELD_RUN_XML = (
+    f'<w:r {nsdecls("w")}><w:fldChar w:fldCharType="begin"/><w:instrText>TOC \\o "1-3" \\h \\z \\u</w:instrText>'
+    '<w:fldChar w:fldCharType="separate"/><w:fldChar w:fldCharType="end"/></w:r>'
+)
+
+# The only Excel columns process_data reads; everything else in the export is skipped while parsing
+REPORT_COLUMNS = frozenset({
+    'Issue Type', 'Key', 'Summary', 'Hebrew Summary', 'Status', 'Description', 'Start date', 'Due date',
+})
+
+# Exported roadmap file names carry the export timestamp, e.g. Roadmap_240101_1200.xlsx
+ROADMAP_FILE_RE = re.compile(r"Roadmap_(\d{6}_\d{4})\.xlsx?$", re.IGNORECASE)
+
+TEMPLATE_PATH = 'template.docx'
+
+# Order in which initiative statuses are reported; 'To Do' only appears in the extended report
+STATUS_RANK = {'Done': 0, 'In Progress': 1, 'Next': 2, 'To Do': 3}
+
+# Color of each status heading
+STATUS_COLORS = {
+    'Done': RGBColor(0, 128, 0),          # Green
+    'In Progress': RGBColor(0, 0, 255),   # Blue
+    'Next': RGBColor(255, 165, 0),        # Orange
+    'To Do': RGBColor(128, 128, 128)      # Grey
+}
+
+# A report that is open in Word cannot be replaced; retry a few times with backoff before giving up
+SAVE_ATTEMPTS = 3
+
+# Body text size and paragraph spacing
+BODY_FONT_SIZE = Pt(12)
+PARAGRAPH_SPACE_AFTER = Pt(6)
+
+# Gap above "Linked initiatives:", roughly the two blank 12pt lines it used to start with
+LINKED_INITIATIVES_SPACING = Pt(24)
+
+# Small grey hint under the Table of Contents
+TOC_REMINDER_FONT_SIZE = Pt(9)
+TOC_REMINDER_COLOR = RGBColor(128, 128, 128)
+
+# Status table column widths
+TITLE_COLUMN_WIDTH = Cm(5)
+DESCRIPTION_COLUMN_WIDTH = Cm(10)
+STATUS_TABLE_CELL_MARGIN = Cm(0.1)
+
+# Header-only status table; every status table is cloned from it. The layout is fixed, so Word takes the
+# column widths from <w:tblGrid> instead of re-measuring every row, and the cell margins are set once for the table
+STATUS_TABLE_XML = (
+    f'<w:tbl {nsdecls("w")}>'
+    '<w:tblPr><w:tblStyle w:val="{style_id}"/><w:tblW w:type="auto" w:w="0"/><w:tblLayout w:type="fixed"/>'
+    '<w:tblCellMar>'
+    + ''.join(f'<w:{side} w:w="{STATUS_TABLE_CELL_MARGIN.twips}" w:type="dxa"/>' for side in ('top', 'left', 'bottom', 'right'))
+    + '</w:tblCellMar>'
+    '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0" w:noHBand="0" w:noVBand="1"/>'
+    '</w:tblPr>'
+    f'<w:tblGrid><w:gridCol w:w="{TITLE_COLUMN_WIDTH.twips}"/><w:gridCol w:w="{DESCRIPTION_COLUMN_WIDTH.twips}"/></w:tblGrid>'
+    f'<w:tr><w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{TITLE_COLUMN_WIDTH.twips}"/></w:tcPr><w:p><w:r><w:t>Title</w:t></w:r></w:p></w:tc>'
+    f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{DESCRIPTION_COLUMN_WIDTH.twips}"/></w:tcPr><w:p><w:r><w:t>Description</w:t></w:r></w:p></w:tc></w:tr>'
+    '</w:tbl>'
+)
+
+# Body XML snippets are written without namespace declarations; they are parsed in one go inside
+# this throwaway wrapper and then moved to their place in the document
+FRAGMENT_XML = f'<w:body {nsdecls("w", "r")}>{{xml}}</w:body>'
+
+# Status table row templates, filled in by build_initiative_row_xml
+INITIATIVE_ROW_XML = (
+    '<w:tr>'
+    f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{TITLE_COLUMN_WIDTH.twips}"/></w:tcPr>{{title_cell}}</w:tc>'
+    f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{DESCRIPTION_COLUMN_WIDTH.twips}"/></w:tcPr>{{description_cell}}</w:tc>'
+    '</w:tr>'
+)
+HYPERLINK_RUN_XML = (
+    f'<w:r><w:rPr><w:rStyle w:val="{HYPERLINK_STYLE_ID}"/></w:rPr>'
+    '<w:hyperlink r:id="{r_id}"><w:r><w:rPr/><w:t xml:space="preserve">{text}</w:t></w:r></w:hyperlink>'
+    '</w:r>'
+)
+# Hebrew text goes in its own right-aligned body-size paragraph; w:sz is measured in half-points
+HEBREW_RUN_RPR_XML = f'<w:rPr><w:sz w:val="{round(BODY_FONT_SIZE.pt * 2)}"/></w:rPr>'
+HEBREW_PARAGRAPH_XML = '<w:p><w:pPr><w:jc w:val="right"/></w:pPr>{run}</w:p>'
+LINKED_INITIATIVES_HEADING_XML = (
+    f'<w:p><w:pPr><w:spacing w:before="{LINKED_INITIATIVES_SPACING.twips}"/></w:pPr>'
+    '<w:r><w:t>Linked initiatives:</w:t></w:r></w:p>'
+)
+RUN_BREAK_RE = re.compile(r'([\t\r\n])')
+
+def get_hyperlink_r_id(part, state, url):
+    """
+    Returns the relationship id of an external hyperlink to `url`, adding the relationship if needed.
+    """
+    # relate_to scans every relationship of the part, so remember the rId per URL
+    r_id = state.hyperlink_r_ids.get(url)
+    if r_id is None:
+        r_id = state.hyperlink_r_ids[url] = part.relate_to(
+            url, docx.opc.constants.RELATIONSHIP_TYPE.HYPERLINK, is_external=True
+        )
+    return r_id
+
+def add_hyperlink(run, state, url, text):
     """
     Adds a hyperlink to a run in a Word document.
     """
-    run.font.underline = True
-    r_id = run.part.relate_to(url, docx.opc.constants.RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
-    hyperlink = OxmlElement('w:hyperlink')
-    hyperlink.set(qn('r:id'), r_id)
-    new_run = OxmlElement('w:r')
-    r_pr = OxmlElement('w:rPr')
-    new_run.append(r_pr)
-    new_run.text = text
-    hyperlink.append(new_run)
-    run._r.append(hyperlink)
+    if run._r.rPr is None:
+        # Fresh run: clone the prebuilt Hyperlink style properties instead of going through run.style
+        run._r.insert(0, deepcopy(HYPERLINK_RPR))
+    else:
+        run._r.style = HYPERLINK_STYLE_ID
+    r_id = get_hyperlink_r_id(run.part, state, url)
+    # One parse of the whole subtree instead of building each element separately
+    run._r.append(parse_xml(HYPERLINK_XML.format(r_id=r_id, text=escape(text))))
 
 
 
 
-def read_excel_file(file_path):
+def cell_to_str(value):
+    """
+    Converts a raw cell value to the string form used throughout the report.
     """
-    Reads the Excel file containing Jira issues and returns a list of dictionaries.
+    # Most Jira cells are already text; return them before any other checks
+    if type(value) is str:
+        return value
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def iter_row_dicts(rows):
     """
+    Turns an iterator of raw sheet rows into dictionaries keyed by the header row.
+    Every row has exactly the columns listed in REPORT_COLUMNS.
+    """
+    header = [cell_to_str(name) for name in next(rows, ())]
+    column_index = {name: index for index, name in enumerate(header) if name in REPORT_COLUMNS}
+    # A column missing from the export gets an index past the end of every row, so it reads as ''
+    columns = [(name, column_index.get(name, sys.maxsize)) for name in REPORT_COLUMNS]
+    issue_type_index = column_index.get('Issue Type')
+    summary_index = column_index.get('Summary')
+    check_sentinel = issue_type_index is not None and summary_index is not None
+    for row in rows:
+        # Stop at the "Not an issue" row, before it or anything after it is stringified
+        if (check_sentinel and len(row) > max(issue_type_index, summary_index)
+                and row[summary_index] == "Not an issue" and row[issue_type_index] in (None, '')):
+            break
+        yield {name: cell_to_str(row[index]) if index < len(row) else '' for name, index in columns}
+
+def iter_calamine_rows(file_path):
+    """
+    Streams the rows of the first sheet as dictionaries using the calamine parser.
+    """
+    wb = CalamineWorkbook.from_path(file_path)
     try:
-        if file_path.endswith('.xls'):
-            xls_file_path = os.path.abspath(file_path)
-            xlsx_file_path = xls_file_path + 'x'
-            
-            # Read the .xls file using pandas
-            df = pd.read_excel(xls_file_path, engine='xlrd')
-            
-            # Save it as .xlsx using openpyxl
-            df.to_excel(xlsx_file_path, index=False, engine='openpyxl')
-            
-            file_path = xlsx_file_path
-        
-        # Read the .xlsx file
-        df = pd.read_excel(file_path, engine='openpyxl')
-        df = df.fillna('').astype(str)
-        data = df.to_dict('records')
-        return data
-    except Exception as e:
-        logging.error(f"Error reading Excel file '{file_path}': {e}")
-        return []
-
-def process_data(data):
-    """
-    Processes the data from Excel, organizing it into a hierarchical structure.
-    """
-    structured_data = {}
-    current_theme = None
-    current_goal = None
-    current_status = None
-    current_initiative = None
-
-    for row in data:
-        issue_type = row.get('Issue Type', '')
-        issue_key = row.get('Key', '')
-        summary = row.get('Summary', '')
-        hebrew_summary = row.get('Hebrew Summary', '')
-        status = row.get('Status', '')
-        description = row.get('Description', '')
-        start_date = row.get('Start date', '')
-        due_date = row.get('Due date', '')
-
-        if issue_type == 'Theme':
-            # Start a new theme
-            current_theme = issue_key
-            structured_data[current_theme] = {
-                'summary': summary,
-                'hebrew_summary': hebrew_summary,
-                'goals': {}
-            }
-            current_goal = None
-            current_status = None
-            current_initiative = None
-        elif issue_type == 'Goal':
-            # Add a goal under the current theme
-            if current_theme:
-                current_goal = issue_key
-                structured_data[current_theme]['goals'][current_goal] = {
-                    'summary': summary,
-                    'hebrew_summary': hebrew_summary,
-                    'description': description,
-                    'statuses': {}
-                }
-                current_status = None
-                current_initiative = None
-            else:
-                logging.warning(f"Goal '{issue_key}' found without a current theme.")
-        elif issue_type == 'Initiative':
-            # Add an initiative under the current goal
-            if current_theme and current_goal:
-                current_status = status
-                current_initiative = issue_key
-                statuses = structured_data[current_theme]['goals'][current_goal]['statuses']
-                if current_status not in statuses:
-                    statuses[current_status] = {}
-                statuses[current_status][current_initiative] = {
-                    'summary': summary,
-                    'hebrew_summary': hebrew_summary,
-                    'description': description,
-                    'start_date': start_date,
-                    'due_date': due_date,
-                    'leads': {}
-                }
-            else:
-                logging.warning(f"Initiative '{issue_key}' found without a current theme and goal.")
-        elif issue_type == 'Lead':
-            # Add a lead under the current initiative
-            if current_theme and current_goal and current_status and current_initiative:
-                leads = structured_data[current_theme]['goals'][current_goal]['statuses'][current_status][current_initiative]['leads']
-                leads[issue_key] = {
-                    'summary': summary,
-                    'hebrew_summary': hebrew_summary,
-                    'description': description
-                }
-            else:
-                logging.warning(f"Lead '{issue_key}' found without a current theme, goal, status, and initiative.")
+        yield from iter_row_dicts(wb.get_sheet_by_index(0).iter_rows())
+    finally:
+        wb.close()
+
+def iter_openpyxl_rows(file_path):
+    """
+    Streams the rows of the first sheet as dictionaries using openpyxl's read-only mode.
+    """
+    from openpyxl import load_workbook  # only this fallback needs openpyxl; keep it off the startup path
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # The first sheet, like the calamine and pandas readers; the active sheet may be another one
+        yield from iter_row_dicts(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+def iter_excel_rows(file_path):
+    """
+    Yields the rows of the Excel file containing Jira issues as dictionaries, one at a time.
+    Every row has all of REPORT_COLUMNS as keys; blank or missing cells are empty strings.
+    Read errors propagate to the caller, so a sheet that fails partway through never yields a partial report.
+    """
+    if CalamineWorkbook is not None:
+        # calamine reads both .xls and .xlsx directly, no DataFrame roundtrip needed
+        yield from iter_calamine_rows(file_path)
+        return
+
+    if file_path.endswith('.xls'):
+        # openpyxl cannot read .xls; have pandas parse every cell straight to a string, blanks as ''
+        import pandas as pd  # only this fallback needs pandas; keep it off the startup path
+        df = pd.read_excel(
+            file_path, engine='xlrd', usecols=lambda name: name in REPORT_COLUMNS, dtype=str, na_filter=False
+        )
+        # process_data stops at the "Not an issue" row, so drop it and everything after
+        if 'Issue Type' in df.columns and 'Summary' in df.columns:
+            sentinel = df['Issue Type'].eq('') & df['Summary'].eq("Not an issue")
+            if sentinel.any():
+                df = df.iloc[:sentinel.to_numpy().argmax()]
+        for name in REPORT_COLUMNS.difference(df.columns):
+            df[name] = ''
+        # Stream plain tuples instead of building every record dict up front
+        columns = list(df.columns)
+        for values in df.itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+        return
+
+    # Stream the .xlsx file instead of materializing a DataFrame
+    yield from iter_openpyxl_rows(file_path)
+
+def handle_theme_row(row, state):
+    """
+    Starts a new theme.
+    """
+    issue_key = row['Key']
+    state.current_theme = state.structured_data[issue_key] = Theme(
+        row['Summary'], row['Hebrew Summary'], url=JIRA_BROWSE_URL + issue_key
+    )
+    state.current_goal = None
+    state.current_status = None
+    state.current_initiative = None
+
+def handle_goal_row(row, state):
+    """
+    Adds a goal under the current theme.
+    """
+    issue_key = row['Key']
+    if state.current_theme is not None:
+        state.current_goal = state.current_theme.goals[issue_key] = Goal(
+            row['Summary'], row['Hebrew Summary'], row['Description'],
+            url=JIRA_BROWSE_URL + issue_key
+        )
+        state.current_status = None
+        state.current_initiative = None
+    else:
+        logging.warning("Goal '%s' found without a current theme.", issue_key)
+
+def handle_initiative_row(row, state):
+    """
+    Adds an initiative under the current goal, grouped by its status.
+    """
+    issue_key = row['Key']
+    if state.current_goal is not None:
+        state.current_status = sys.intern(row['Status'])
+        # Descriptions are often blank or copy-pasted; intern them so repeats share one string
+        state.current_initiative = Initiative(
+            row['Summary'], row['Hebrew Summary'], sys.intern(row['Description']),
+            format_date(row['Start date']), format_date(row['Due date']), url=JIRA_BROWSE_URL + issue_key
+        )
+        state.current_goal.statuses.setdefault(state.current_status, {})[issue_key] = state.current_initiative
+    else:
+        logging.warning("Initiative '%s' found without a current theme and goal.", issue_key)
+
+def handle_lead_row(row, state):
+    """
+    Adds a lead under the current initiative.
+    """
+    issue_key = row['Key']
+    if state.current_initiative is not None and state.current_status:
+        state.current_initiative.leads[issue_key] = Lead(
+            sys.intern(row['Summary']), row['Hebrew Summary'], sys.intern(row['Description']),
+            url=JIRA_BROWSE_URL + issue_key
+        )
+    else:
+        logging.warning("Lead '%s' found without a current theme, goal, status, and initiative.", issue_key)
+
+ISSUE_TYPE_HANDLERS = {
+    'Theme': handle_theme_row,
+    'Goal': handle_goal_row,
+    'Initiative': handle_initiative_row,
+    'Lead': handle_lead_row,
+}
+
+def process_data(rows):
+    """
+    Processes the rows from Excel in a single pass, organizing them into a hierarchical structure.
+    """
+    state = ParseState()
+
+    for row in rows:
+        # Issue types and statuses come from a handful of values; intern them so
+        # repeated rows share one string object and compare by identity first
+        issue_type = sys.intern(row['Issue Type'])
+        handler = ISSUE_TYPE_HANDLERS.get(issue_type)
+        if handler is not None:
+            handler(row, state)
         elif issue_type == '':
             # Stop processing if a row with "Not an issue" is found
-            if summary == "Not an issue":
+            if row['Summary'] == "Not an issue":
                 break
         else:
-            logging.warning(f"Unknown issue type '{issue_type}' for key '{issue_key}'.")
+            # Per-row warnings use lazy %-formatting; a malformed sheet can emit one per row
+            logging.warning("Unknown issue type '%s' for key '%s'.", issue_type, row['Key'])
 
-    return structured_data
+    return state.structured_data
 
 def create_word_document(structured_data, output_file_path, date_time_str, include_todo=False):
     """
     Creates a Word document from the structured data.
     """
     # Load the template document
-    doc = Document('template.docx')
+    doc = Document(TEMPLATE_PATH)
     setup_document(doc, date_time_str)
-    add_content(doc, structured_data, include_todo)
+    state = create_render_state(doc)
+    add_content(doc, state, structured_data, include_todo)
     success = save_document(doc, output_file_path)
     return success
 
@@ -188,17 +467,7 @@ def add_headers_and_footers(doc):
     footer_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     # Add page number field
-    page_number_run = footer_paragraph.add_run()
-    fld_char = OxmlElement('w:fldChar')
-    fld_char.set(qn('w:fldCharType'), 'begin')
-
-    instr_text = OxmlElement('w:instrText')
-    instr_text.text = 'PAGE'
-
-    fld_char_end = OxmlElement('w:fldChar')
-    fld_char_end.set(qn('w:fldCharType'), 'end')
-
-    page_number_run._r.extend([fld_char, instr_text, fld_char_end])
+    footer_paragraph._p.append(parse_xml(PAGE_FIELD_RUN_XML))
 
 def add_cover_page(doc, date_time_str):
     doc.add_heading("Roadmap Status Report", 0)
@@ -207,23 +476,40 @@ def add_cover_page(doc, date_time_str):
     doc.add_paragraph(f"Prepared by: {getpass.getuser()}")
     doc.add_page_break()
 
-def setup_document(doc, date_time_str):
+def create_render_state(doc):
     """
-    Sets up the document layout and styles.
+    Resolves the styles used per heading/table once instead of looking them up by name each time.
+    """
+    styles = doc.styles
+    # Parse the styled header-only table once per document; each status table is a clone of it
+    status_table_style = styles['Light Shading Accent 1']
+    return RenderState(
+        heading_styles={level: styles[f'Heading {level}'] for level in (1, 2, 3)},
+        status_table_template=parse_xml(STATUS_TABLE_XML.format(style_id=status_table_style.style_id)),
+    )
+
+def setup_page_layout(doc):
+    """
+    Sets the page orientation and size of the document's section.
     """
-    add_cover_page(doc, date_time_str)
-
     section = doc.sections[0]
     section.orientation = WD_ORIENTATION.PORTRAIT
     new_width, new_height = section.page_height, section.page_width
     section.page_width = new_width
     section.page_height = new_height
 
-    styles = doc.styles
+def setup_document(doc, date_time_str):
+    """
+    Sets up the document layout and styles.
+    """
+    add_cover_page(doc, date_time_str)
+    setup_page_layout(doc)
 
     # Update Normal style for paragraphs
     normal_style = doc.styles['Normal']
-    normal_style.paragraph_format.space_after = Pt(6)
+    normal_style.paragraph_format.space_after = PARAGRAPH_SPACE_AFTER
+    # Table rows are written as raw XML without run sizes, so they take 12pt from Normal
+    normal_style.font.size = BODY_FONT_SIZE
 
     add_toc_field(doc)
     add_headers_and_footers(doc)
@@ -235,207 +521,322 @@ def add_toc_field(doc):
     doc.add_heading("Roadmap Status Report", level=0)
     doc.add_paragraph("Table of Contents", style='TOC Heading')
     paragraph = doc.add_paragraph()
-    run = paragraph.add_run()
-    fld_char_begin = OxmlElement('w:fldChar')
-    fld_char_begin.set(qn('w:fldCharType'), 'begin')
-    instr_text = OxmlElement('w:instrText')
-    instr_text.text = 'TOC \\o "1-3" \\h \\z \\u'
-    fld_char_separate = OxmlElement('w:fldChar')
-    fld_char_separate.set(qn('w:fldCharType'), 'separate')
-    fld_char_end = OxmlElement('w:fldChar')
-    fld_char_end.set(qn('w:fldCharType'), 'end')
-    run._r.extend([fld_char_begin, instr_text, fld_char_separate, fld_char_end])
+    paragraph._p.append(parse_xml(TOC_FIELD_RUN_XML))
 
     reminder = doc.add_paragraph()
     reminder_run = reminder.add_run("Right-click and select 'Update Field' to update the Table of Contents.")
     reminder_run.font.italic = True
-    reminder_run.font.size = Pt(9)
-    reminder_run.font.color.rgb = RGBColor(128, 128, 128)
+    reminder_run.font.size = TOC_REMINDER_FONT_SIZE
+    reminder_run.font.color.rgb = TOC_REMINDER_COLOR
 
-def add_content(doc, structured_data, include_todo):
+def add_content(doc, state, structured_data, include_todo):
     """
     Adds the content to the document based on the structured data.
     """
-    status_order = ['Done', 'In Progress', 'Next']
-    if include_todo:
-        status_order.append('To Do')
-
     for theme_key, theme_data in structured_data.items():
-        theme_printed = False
-        for goal_key, goal_data in theme_data['goals'].items():
-            goal_printed = False
-            for status in status_order:
-                if status in goal_data['statuses'] and goal_data['statuses'][status]:
-                    theme_printed, goal_printed = add_theme_goal_content(
-                        doc, theme_key, theme_data, goal_key, goal_data, status, theme_printed, goal_printed
-                    )
-
-def add_theme_goal_content(doc, theme_key, theme_data, goal_key, goal_data, status, theme_printed, goal_printed):
+        add_theme_content(doc, state, theme_key, theme_data, include_todo)
+
+def get_shown_statuses(goal_data, include_todo):
+    """
+    Returns the statuses of a goal that appear in the report, in report order.
+    """
+    # Statuses ranked at or past the cutoff (or not ranked at all) are left out of the report
+    rank_cutoff = len(STATUS_RANK) if include_todo else STATUS_RANK['To Do']
+    # Walk only the statuses this goal actually has
+    return sorted(
+        (status for status in goal_data.statuses if STATUS_RANK.get(status, rank_cutoff) < rank_cutoff),
+        key=STATUS_RANK.__getitem__
+    )
+
+def add_theme_content(doc, state, theme_key, theme_data, include_todo):
+    """
+    Adds the headings and status tables of a single theme to the document.
+    """
+    theme_printed = False
+    for goal_key, goal_data in theme_data.goals.items():
+        goal_printed = False
+        for status in get_shown_statuses(goal_data, include_todo):
+            theme_printed, goal_printed = add_theme_goal_content(
+                doc, state, theme_key, theme_data, goal_key, goal_data, status, theme_printed, goal_printed
+            )
+
+def add_theme_goal_content(doc, state, theme_key, theme_data, goal_key, goal_data, status, theme_printed, goal_printed):
     if not theme_printed:
-        heading = doc.add_heading(level=1)
-        heading.add_run(f"{theme_data['summary']} (")
-        add_hyperlink(heading.add_run(), f"https://omnisys.atlassian.net/browse/{theme_key}", theme_key)
+        heading = doc.add_paragraph(style=state.heading_styles[1])
+        heading.add_run(f"{theme_data.summary} (")
+        add_hyperlink(heading.add_run(), state, theme_data.url, theme_key)
         heading.add_run(")")
 
-        # Add Hebrew summary with RTL control characters
-        hebrew_text = format_hebrew_text(theme_data['hebrew_summary'])
-        hebrew_summary = doc.add_paragraph()
-        hebrew_run = hebrew_summary.add_run(hebrew_text)
-        hebrew_run.font.size = Pt(12)
-        hebrew_summary.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        hebrew_summary.paragraph_format.bidi = True
+        # Add Hebrew summary with RTL control characters; items without a translation get no empty paragraph
+        if theme_data.hebrew_summary:
+            add_hebrew_paragraph(doc, theme_data.hebrew_summary)
         theme_printed = True
 
     if not goal_printed:
-        heading = doc.add_heading(level=2)
-        heading.add_run(f"{goal_data['summary']} (")
-        add_hyperlink(heading.add_run(), f"https://omnisys.atlassian.net/browse/{goal_key}", goal_key)
+        heading = doc.add_paragraph(style=state.heading_styles[2])
+        heading.add_run(f"{goal_data.summary} (")
+        add_hyperlink(heading.add_run(), state, goal_data.url, goal_key)
         heading.add_run(")")
 
-        # Add Hebrew summary with RTL control characters
-        hebrew_text = format_hebrew_text(goal_data['hebrew_summary'])
-        hebrew_summary = doc.add_paragraph()
-        hebrew_run = hebrew_summary.add_run(hebrew_text)
-        hebrew_run.font.size = Pt(12)
-        hebrew_summary.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        hebrew_summary.paragraph_format.bidi = True
+        # Add Hebrew summary with RTL control characters; items without a translation get no empty paragraph
+        if goal_data.hebrew_summary:
+            add_hebrew_paragraph(doc, goal_data.hebrew_summary)
         goal_printed = True
 
-    add_status_table(doc, status, goal_data['statuses'][status])
+    add_status_table(doc, state, status, goal_data.statuses[status])
     return theme_printed, goal_printed
 
-def add_status_table(doc, status, initiatives):
+def add_status_table(doc, state, status, initiatives):
     """
     Adds a table for the status and its initiatives to the document.
     """
-    status_colors = {
-        'Done': RGBColor(0, 128, 0),          # Green
-        'In Progress': RGBColor(0, 0, 255),   # Blue
-        'Next': RGBColor(255, 165, 0),        # Orange
-        'To Do': RGBColor(128, 128, 128)      # Grey
-    }
-
-    status_heading = doc.add_heading(level=3)
+    status_heading = doc.add_paragraph(style=state.heading_styles[3])
     status_run = status_heading.add_run(f"Status: {status}")
-    if status in status_colors:
-        status_run.font.color.rgb = status_colors[status]
-
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Light Shading Accent 1'  # Use a built-in style
-    table.autofit = True
-    table.columns[0].width = Cm(5)
-    table.columns[1].width = Cm(10)
+    status_color = STATUS_COLORS.get(status)
+    if status_color is not None:
+        status_run.font.color.rgb = status_color
 
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Title'
-    hdr_cells[1].text = 'Description'
+    tbl = deepcopy(state.status_table_template)
+    doc.element.body._insert_tbl(tbl)
 
-    for initiative_key, initiative_data in initiatives.items():
-        row_cells = table.add_row().cells
-        add_initiative_to_table(row_cells, initiative_key, initiative_data)
+    # One parse for all rows instead of a python-docx call for every paragraph and run
+    rows_xml = ''.join(
+        build_initiative_row_xml(doc.part, state, initiative_key, initiative_data)
+        for initiative_key, initiative_data in initiatives.items()
+    )
+    tbl.extend(parse_xml(FRAGMENT_XML.format(xml=rows_xml)))
 
     doc.add_paragraph()
-    # Adjust cell margins
-    for row in table.rows:
-        for cell in row.cells:
-            cell.margin_top = Cm(0.1)
-            cell.margin_bottom = Cm(0.1)
-            cell.margin_left = Cm(0.1)
-            cell.margin_right = Cm(0.1)
-
-def add_initiative_to_table(row_cells, initiative_key, initiative_data):
-    for cell in row_cells:
-        cell.paragraphs[0].style.font.size = Pt(12)
-
-    # Add initiative summary and key
-    summary_paragraph = row_cells[0].paragraphs[0]
-    summary_paragraph.clear()
-    summary_paragraph.style.font.size = Pt(12)
-    summary_paragraph.add_run(f"{initiative_data['summary']} (")
-    add_hyperlink(summary_paragraph.add_run(), f"https://omnisys.atlassian.net/browse/{initiative_key}", initiative_key)
-    summary_paragraph.add_run(")")
-
-    # Add Hebrew summary with RTL control characters
-    hebrew_text = format_hebrew_text(initiative_data['hebrew_summary'])
-    hebrew_summary = row_cells[0].add_paragraph()
-    hebrew_run = hebrew_summary.add_run(hebrew_text)
-    hebrew_run.font.size = Pt(12)
-    hebrew_summary.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    hebrew_summary.paragraph_format.bidi = True
-
-    # Add start date and due date
-    start_date = format_date(initiative_data['start_date']) if initiative_data['start_date'] else 'Unknown'
-    due_date = format_date(initiative_data['due_date']) if initiative_data['due_date'] else 'Unknown'
-    dates_paragraph = row_cells[0].add_paragraph()
-    dates_paragraph.add_run(f"Start Date: {start_date}\nDue Date: {due_date}")
-    dates_paragraph.style.font.size = Pt(12)
-
-    # Add description
-    description_paragraph = row_cells[1].paragraphs[0]
-    description_paragraph.text = format_hebrew_text(initiative_data['description'])
-    description_paragraph.style.font.size = Pt(12)
-
-    # Add linked initiatives
-    if initiative_data['leads']:
-        linked_initiatives = row_cells[1].add_paragraph("\n\nLinked initiatives:")
-        linked_initiatives.style.font.size = Pt(12)
-        for lead_key, lead_data in initiative_data['leads'].items():
-            p = row_cells[1].add_paragraph("- ")
-            p.add_run(f"{format_hebrew_text(lead_data['summary'])} (")
-            add_hyperlink(p.add_run(), f"https://omnisys.atlassian.net/browse/{lead_key}", lead_key)
-            p.add_run(")")
-            p.style.font.size = Pt(12)
+
+def run_xml(text, rpr=''):
+    """
+    Returns a <w:r> element string for `text`, with tabs and line breaks mapped the way python-docx maps them.
+    """
+    content = []
+    for piece in RUN_BREAK_RE.split(text):
+        if piece == '\t':
+            content.append('<w:tab/>')
+        elif piece == '\n' or piece == '\r':
+            content.append('<w:br/>')
+        elif piece:
+            space = ' xml:space="preserve"' if len(piece.strip()) < len(piece) else ''
+            content.append(f'<w:t{space}>{escape(piece)}</w:t>')
+    return f'<w:r>{rpr}{"".join(content)}</w:r>'
+
+def hebrew_paragraph_xml(text):
+    """
+    Returns a right-aligned paragraph for Hebrew text, wrapped in RTL control characters, as an XML string.
+    """
+    return HEBREW_PARAGRAPH_XML.format(run=run_xml(format_hebrew_text(text), HEBREW_RUN_RPR_XML))
+
+def add_hebrew_paragraph(doc, text):
+    """
+    Adds a right-aligned Hebrew paragraph to the end of the document body.
+    """
+    doc.element.body._insert_p(parse_xml(FRAGMENT_XML.format(xml=hebrew_paragraph_xml(text)))[0])
+
+def linked_text_xml(part, state, text, url, key):
+    """
+    Returns the runs for "text (KEY)" with the key hyperlinked to `url`.
+    """
+    r_id = get_hyperlink_r_id(part, state, url)
+    return run_xml(f"{text} (") + HYPERLINK_RUN_XML.format(r_id=r_id, text=escape(key)) + run_xml(")")
+
+def build_initiative_row_xml(part, state, initiative_key, initiative_data):
+    """
+    Returns the status table row for an initiative as a single <w:tr> XML string.
+    """
+    # Title cell: summary with key, Hebrew summary, start and due dates
+    start_date = initiative_data.start_date or 'Unknown'
+    due_date = initiative_data.due_date or 'Unknown'
+    dates_run = run_xml(f"Start Date: {start_date}\nDue Date: {due_date}")
+    title_cell = f'<w:p>{linked_text_xml(part, state, initiative_data.summary, initiative_data.url, initiative_key)}</w:p>'
+    if initiative_data.hebrew_summary:
+        title_cell += hebrew_paragraph_xml(initiative_data.hebrew_summary)
+    title_cell += f'<w:p>{dates_run}</w:p>'
+
+    # Description cell; an empty description leaves an empty paragraph
+    if initiative_data.description:
+        description_cell = f'<w:p>{run_xml(format_hebrew_text(initiative_data.description))}</w:p>'
+    else:
+        description_cell = '<w:p/>'
+    if initiative_data.leads:
+        # Space above the heading instead of leading line breaks, which each become a <w:br/>
+        description_cell += LINKED_INITIATIVES_HEADING_XML
+        for lead_key, lead_data in initiative_data.leads.items():
+            lead_runs = linked_text_xml(part, state, format_hebrew_text(lead_data.summary), lead_data.url, lead_key)
+            description_cell += f'<w:p>{run_xml("- ")}{lead_runs}</w:p>'
+
+    return INITIATIVE_ROW_XML.format(title_cell=title_cell, description_cell=description_cell)
+
+def is_open_in_word(file_path):
+    """
+    Checks for the '~$' owner file Word keeps next to a document while it is open.
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    # Word prefixes short names and replaces the first two characters of longer ones
+    return any(os.path.exists(os.path.join(directory, '~$' + candidate)) for candidate in (name, name[2:]))
+
+def get_report_file_mode(file_path):
+    """
+    Returns the permission bits for the saved report: those of the report being replaced, else the umask default.
+    """
+    try:
+        return os.stat(file_path).st_mode & 0o777
+    except FileNotFoundError:
+        # os.umask can only be read by setting it, so put it straight back
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
 
 def save_document(doc, output_file_path):
     """
     Saves the Word document to the specified file path.
     """
+    # Build the archive in memory once: the file gets a single large write, and lock retries do not re-serialize
+    buffer = io.BytesIO()
     try:
-        doc.save(output_file_path)
-    except PermissionError:
-        logging.error(f"PermissionError: Unable to save '{output_file_path}'. Please close the file if it's open and try again.")
-        return False
+        doc.save(buffer)
     except Exception as e:
         logging.error(f"Error saving document: {e}")
         return False
-    return True
 
-def update_toc(doc_path):
+    output_dir = os.path.dirname(os.path.abspath(output_file_path))
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        tmp_path = None
+        try:
+            # Write next to the target and swap it in, so a failed save never leaves a half-written report
+            with tempfile.NamedTemporaryFile(suffix='.docx', dir=output_dir, delete=False) as tmp_file:
+                tmp_path = tmp_file.name
+                tmp_file.write(buffer.getbuffer())
+            # NamedTemporaryFile creates the file owner-only, and os.replace keeps that mode
+            os.chmod(tmp_path, get_report_file_mode(output_file_path))
+            os.replace(tmp_path, output_file_path)
+            return True
+        except PermissionError:
+            if is_open_in_word(output_file_path):
+                # Word holds the lock until the user closes the file; retrying will not help
+                logging.error(f"'{output_file_path}' is open in Word. Please close it and try again.")
+                return False
+            if attempt == SAVE_ATTEMPTS:
+                logging.error(f"PermissionError: Unable to save '{output_file_path}'. Please close the file if it's open and try again.")
+                return False
+            logging.warning(f"'{output_file_path}' is locked, retrying (attempt {attempt} of {SAVE_ATTEMPTS})...")
+            time.sleep(2 ** (attempt - 1))
+        except Exception as e:
+            logging.error(f"Error saving document: {e}")
+            return False
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return False
+
+def start_word():
     """
-    Updates the Table of Contents in the Word document.
+    Starts a hidden Word instance for finalizing the reports. Returns None if Word cannot be started.
     """
     try:
+        import win32com.client  # loading COM support is slow, so defer it until Word is needed
         word = win32com.client.Dispatch("Word.Application")
         word.Visible = False
-        doc = word.Documents.Open(doc_path)
-        doc.TablesOfContents(1).Update()
-        doc.Save()
-        doc.Close()
-        word.Quit()
-        logging.info("Table of Contents updated successfully.")
+        word.DisplayAlerts = 0  # wdAlertsNone: a modal prompt in the hidden instance would stall automation
+        return word
     except Exception as e:
-        logging.error(f"Error updating Table of Contents: {e}")
+        logging.error(f"Error starting Word: {e}")
+        return None
 
-def convert_docx_to_pdf(docx_path, pdf_path):
+def finalize_document(word, docx_path, pdf_path):
     """
-    Converts a Word document to a PDF file.
+    Updates the Table of Contents in the Word document and converts it to a PDF file, opening it only once.
     """
     try:
-        word = win32com.client.Dispatch("Word.Application")
-        word.Visible = False
         doc = word.Documents.Open(docx_path)
-        doc.SaveAs(pdf_path, FileFormat=17)  # 17 is the code for PDF format    
-        doc.Close()
-        word.Quit()
-        logging.info(f"Word document converted to PDF: '{pdf_path}'")
     except Exception as e:
-        logging.error(f"Error converting Word document to PDF: {e}")
-    
+        logging.error(f"Error opening Word document '{docx_path}': {e}")
+        return
+    try:
+        try:
+            doc.TablesOfContents(1).Update()
+            doc.Save()
+            logging.info("Table of Contents updated successfully.")
+        except Exception as e:
+            logging.error(f"Error updating Table of Contents: {e}")
+        try:
+            doc.SaveAs(pdf_path, FileFormat=17)  # 17 is the code for PDF format
+            logging.info(f"Word document converted to PDF: '{pdf_path}'")
+        except Exception as e:
+            logging.error(f"Error converting Word document to PDF: {e}")
+    finally:
+        # A failed Close must not skip the remaining report or quitting Word
+        try:
+            doc.Close()
+        except Exception as e:
+            logging.error(f"Error closing Word document '{docx_path}': {e}")
+
+def create_excel_workbook(structured_data, output_file_path, include_todo=False):
+    """
+    Writes the status tables to an Excel workbook, one worksheet per theme that has initiatives in the report.
+    """
+    if xlsxwriter is None:
+        logging.error("xlsxwriter is not installed; cannot write the Excel report.")
+        return False
+
+    try:
+        # constant_memory flushes each row as soon as the next one starts; Jira text is always written verbatim.
+        # The with block closes the workbook, removing its temp files, even when writing fails partway through
+        with xlsxwriter.Workbook(
+            output_file_path, {'constant_memory': True, 'strings_to_formulas': False, 'strings_to_urls': False}
+        ) as workbook:
+            bold = workbook.add_format({'bold': True})
+            title_format = workbook.add_format({'bold': True, 'font_size': 14})
+            header = ['Goal', 'Status', 'Key', 'Title', 'Hebrew Title', 'Start Date', 'Due Date', 'Description', 'Linked initiatives']
+            for theme_key, theme_data in structured_data.items():
+                shown_goals = [
+                    (goal_key, goal_data, statuses) for goal_key, goal_data in theme_data.goals.items()
+                    if (statuses := get_shown_statuses(goal_data, include_todo))
+                ]
+                # Like the Word report, a theme with nothing to show gets no sheet
+                if not shown_goals:
+                    continue
+                worksheet = workbook.add_worksheet(theme_key[:31])
+                # Theme title row, with the Hebrew summary under the Hebrew Title column
+                worksheet.write_url(0, 0, theme_data.url, title_format, string=f"{theme_data.summary} ({theme_key})")
+                if theme_data.hebrew_summary:
+                    worksheet.write_string(0, 4, theme_data.hebrew_summary, title_format)
+                worksheet.write_row(1, 0, header, bold)
+                row = 2
+                for goal_key, goal_data, statuses in shown_goals:
+                    for status in statuses:
+                        for initiative_key, initiative_data in goal_data.statuses[status].items():
+                            worksheet.write_string(row, 0, f"{goal_data.summary} ({goal_key})")
+                            worksheet.write_string(row, 1, status)
+                            worksheet.write_url(row, 2, initiative_data.url, string=initiative_key)
+                            worksheet.write_row(row, 3, [
+                                initiative_data.summary,
+                                initiative_data.hebrew_summary,
+                                initiative_data.start_date or 'Unknown',
+                                initiative_data.due_date or 'Unknown',
+                                initiative_data.description,
+                                "\n".join(f"{lead_data.summary} ({lead_key})" for lead_key, lead_data in initiative_data.leads.items()),
+                            ])
+                            row += 1
+    except Exception as e:
+        logging.error(f"Error writing Excel report '{output_file_path}': {e}")
+        # Do not leave a workbook that is missing part of the report behind
+        if os.path.exists(output_file_path):
+            os.remove(output_file_path)
+        return False
+    return True
 
 def main():
     """
     Main function to generate the roadmap report.
     """
+    parser = argparse.ArgumentParser(description="Generate the roadmap status report from a Jira Excel export.")
+    parser.add_argument('--output-format', choices=['docx', 'xlsx', 'both'], default='docx',
+                        help="Write the Word/PDF report, a flat Excel workbook of the status tables, or both.")
+    args = parser.parse_args()
+
     from tkinter import Tk
     from tkinter.filedialog import askopenfilename
 
@@ -446,26 +847,57 @@ def main():
         logging.error("No file selected.")
         return
 
-    date_time_str = re.search(r"Roadmap_(\d{6}_\d{4})\.", os.path.basename(file_path)).group(1)
-    data = read_excel_file(file_path)
-    if not data:
+    match = ROADMAP_FILE_RE.search(os.path.basename(file_path))
+    if not match:
+        logging.error(f"File name '{os.path.basename(file_path)}' does not match 'Roadmap_YYMMDD_HHMM.xlsx'.")
+        return
+    date_time_str = match.group(1)
+    # Rows are streamed straight into the hierarchy, so the sheet is read only once
+    try:
+        structured_data = process_data(iter_excel_rows(file_path))
+    except Exception as e:
+        logging.error(f"Error reading Excel file '{file_path}': {e}")
+        return
+    if not structured_data:
         logging.error("No data read from the Excel file.")
         return
 
-    logging.info(f"Successfully read {len(data)} rows from '{file_path}'")
-    for include_todo in [False, True]:
-        structured_data = process_data(data)
-        suffix = "_extended" if include_todo else ""
-        output_file_name = f"Roadmap_Status_Report_{date_time_str}{suffix}.docx"
-        output_file_path_docx = os.path.join(os.path.dirname(__file__), output_file_name)
-        output_file_path_pdf = os.path.join(r"C:\Users\alexkn\Omnisys LTD\Omnisys LTD Team Site - מסמכי ניהול מוצר\Roadmap Reports", f"Roadmap_Status_Report_{date_time_str}{suffix}.pdf")
-        success = create_word_document(structured_data, output_file_path_docx, date_time_str, include_todo)
-        if success:
-            logging.info(f"\nWord document created: '{output_file_path_docx}'")
-            update_toc(output_file_path_docx)
-            convert_docx_to_pdf(output_file_path_docx, output_file_path_pdf)
-        else:
-            logging.error("\nFailed to create Word document. Please check the error messages above.")
+    logging.info(f"Successfully read {len(structured_data)} themes from '{file_path}'")
+    report_dir = os.path.dirname(__file__)
+    pdf_dir = r"C:\Users\alexkn\Omnisys LTD\Omnisys LTD Team Site - מסמכי ניהול מוצר\Roadmap Reports"
+    variants = [(include_todo, "_extended" if include_todo else "") for include_todo in [False, True]]
+
+    if args.output_format in ('xlsx', 'both'):
+        for include_todo, suffix in variants:
+            output_file_path_xlsx = os.path.join(report_dir, f"Roadmap_Status_Report_{date_time_str}{suffix}.xlsx")
+            if create_excel_workbook(structured_data, output_file_path_xlsx, include_todo):
+                logging.info(f"\nExcel report created: '{output_file_path_xlsx}'")
+        if args.output_format == 'xlsx':
+            return
+
+    word = None
+    word_failed = False
+    try:
+        for include_todo, suffix in variants:
+            output_file_path_docx = os.path.join(report_dir, f"Roadmap_Status_Report_{date_time_str}{suffix}.docx")
+            output_file_path_pdf = os.path.join(pdf_dir, f"Roadmap_Status_Report_{date_time_str}{suffix}.pdf")
+            if create_word_document(structured_data, output_file_path_docx, date_time_str, include_todo):
+                logging.info(f"\nWord document created: '{output_file_path_docx}'")
+                # One Word session serves both reports; starting Word takes seconds, and a failed start is not retried
+                if word is None and not word_failed:
+                    word = start_word()
+                    word_failed = word is None
+                if word is not None:
+                    finalize_document(word, output_file_path_docx, output_file_path_pdf)
+            else:
+                logging.error("\nFailed to create Word document. Please check the error messages above.")
+    finally:
+        if word is not None:
+            # A failed Quit must not replace whatever error is already propagating
+            try:
+                word.Quit()
+            except Exception as e:
+                logging.error(f"Error quitting Word: {e}")
 
 if __name__ == "__main__":
     main()